@@ -16,9 +16,13 @@ export interface GestureDetection {
   confidence: number;
 }
 
+/** A pose landmark as [x, y, z, visibility], with x and y normalized to the frame size */
+export type PoseLandmark = [number, number, number, number];
+
 export interface BodyLanguageAnalysisResult {
   processedImage: string;
   prediction: GestureDetection | null;
+  landmarks?: PoseLandmark[] | null;
 }
 
 export interface SessionResult {
@@ -113,3 +117,41 @@ export function getGestureDescription(gestureName: string): string {
   
   return descriptions[gestureName] || 'A body language gesture detected during your presentation';
 }
+
+// Pairs of MediaPipe pose landmark indices joined in the skeleton
+export const POSE_CONNECTIONS: [number, number][] = [
+  [0, 1], [1, 2], [2, 3], [3, 7], [0, 4], [4, 5], [5, 6], [6, 8], [9, 10],
+  [11, 12], [11, 13], [13, 15], [15, 17], [15, 19], [15, 21], [17, 19],
+  [12, 14], [14, 16], [16, 18], [16, 20], [16, 22], [18, 20],
+  [11, 23], [12, 24], [23, 24], [23, 25], [24, 26], [25, 27], [26, 28],
+  [27, 29], [28, 30], [29, 31], [30, 32], [27, 31], [28, 32]
+];
+
+/**
+ * Draw the pose skeleton on a canvas (matches the server-side drawing style)
+ */
+export function drawPoseLandmarks(
+  ctx: CanvasRenderingContext2D,
+  landmarks: PoseLandmark[],
+  width: number,
+  height: number
+): void {
+  ctx.save();
+  ctx.strokeStyle = 'rgb(255, 0, 255)';
+  ctx.lineWidth = 4;
+  ctx.beginPath();
+  for (const [start, end] of POSE_CONNECTIONS) {
+    if (!landmarks[start] || !landmarks[end]) continue;
+    ctx.moveTo(landmarks[start][0] * width, landmarks[start][1] * height);
+    ctx.lineTo(landmarks[end][0] * width, landmarks[end][1] * height);
+  }
+  ctx.stroke();
+
+  ctx.fillStyle = 'rgb(0, 255, 0)';
+  for (const [x, y] of landmarks) {
+    ctx.beginPath();
+    ctx.arc(x * width, y * height, 6, 0, 2 * Math.PI);
+    ctx.fill();
+  }
+  ctx.restore();
+}
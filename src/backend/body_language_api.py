@@ -1,16 +1,194 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
+from flask_sock import Sock
 import cv2
 import numpy as np
 import base64
+import binascii
+import json
+from collections import Counter
+import threading
 import time
 from body_language_detector import BodyLanguageDetector
 
+try:
+    from turbojpeg import TurboJPEG
+    jpeg = TurboJPEG()
+except Exception as e:
+    print(f"TurboJPEG unavailable, falling back to OpenCV codecs: {e}")
+    jpeg = None
+
 app = Blueprint('body_language', __name__)
+sock = Sock()
 detector = BodyLanguageDetector()
 
 # Store session data
 sessions = {}
 
+# Quality for returned frames; well below OpenCV's default of 95 but indistinguishable for visualization
+JPEG_QUALITY = 80
+
+# Poses are classified in batches by a background worker instead of once per request
+BATCH_SIZE = 8
+BATCH_INTERVAL = 0.1  # seconds
+batch_lock = threading.Lock()  # Guards pending poses and per-session counters; never held while classifying
+classify_lock = threading.Lock()  # Serializes flushes so stop-session waits for an in-flight batch
+batch_ready = threading.Event()
+
+# Frames arriving sooner than this after the last analyzed one reuse its result without being decoded.
+# The jitter margin keeps a client sending exactly every MIN_ANALYSIS_PERIOD from having frames skipped.
+MIN_ANALYSIS_PERIOD = 0.2  # seconds
+ANALYSIS_JITTER = 0.05  # seconds
+
+def decode_frame(image_bytes, session, reuse=True):
+    """
+    Decode JPEG bytes into a BGR frame, reusing the session's buffer while the frame size is stable.
+    Pass reuse=False to decode into a fresh array instead.
+    """
+    if jpeg is None:
+        return cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    
+    if not reuse:
+        return jpeg.decode(image_bytes)
+    
+    # Only reallocate when the camera resolution changes
+    width, height, _, _ = jpeg.decode_header(image_bytes)
+    dst = session['decode_dst']
+    if dst is None or dst.shape[:2] != (height, width):
+        dst = session['decode_dst'] = np.empty((height, width, 3), np.uint8)
+    return jpeg.decode(image_bytes, dst=dst)
+
+def encode_frame(frame, session, reuse=True):
+    """
+    Encode a BGR frame as JPEG into the session's output buffer and return a memoryview of it.
+    Pass reuse=False to encode into a fresh buffer instead.
+    """
+    if jpeg is None:
+        _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        return memoryview(buffer)
+    
+    if not reuse:
+        return memoryview(jpeg.encode(frame, quality=JPEG_QUALITY))
+    
+    # Keep the output buffer as long as it is large enough for the worst-case JPEG of this frame
+    size = jpeg.buffer_size(frame)
+    dst = session['encode_dst']
+    if dst is None or len(dst) < size:
+        dst = session['encode_dst'] = bytearray(size)
+    _, length = jpeg.encode(frame, quality=JPEG_QUALITY, dst=dst)
+    return memoryview(dst)[:length]
+
+def flush_pending_poses(session_ids=None):
+    """Classify buffered poses for the given sessions (all sessions by default) in one batch"""
+    with classify_lock:
+        # Swap out the pending poses, then classify without blocking request threads
+        with batch_lock:
+            batch = []
+            for session_id in (session_ids if session_ids is not None else list(sessions.keys())):
+                session = sessions.get(session_id)
+                if session and session['pending_poses']:
+                    batch.extend((session, pose) for pose in session['pending_poses'])
+                    session['pending_poses'] = []
+        
+        if not batch:
+            return
+        
+        predictions = detector.classify([pose for _, pose in batch])
+        
+        with batch_lock:
+            for (session, _), prediction in zip(batch, predictions):
+                if prediction is not None:
+                    session['gesture_counts'][prediction['class']] += 1
+                    session['last_prediction'] = prediction
+
+def batch_worker():
+    """Drain pending poses whenever a batch fills up or the batch interval elapses"""
+    while True:
+        batch_ready.wait(BATCH_INTERVAL)
+        batch_ready.clear()
+        try:
+            flush_pending_poses()
+        except Exception as e:
+            print(f"Error in batch_worker: {str(e)}")
+
+threading.Thread(target=batch_worker, daemon=True).start()
+
+def is_enabled(value):
+    """Interpret a query string or JSON flag as a boolean"""
+    return value is True or str(value).lower() in ('1', 'true', 'yes')
+
+def process_session_frame(session_id, frame, draw_landmarks=False):
+    """
+    Run the detector on a frame, queue its pose for classification and return the latest prediction
+    along with the pose landmarks as [x, y, z, visibility] rows for client-side drawing
+    """
+    processed_frame, pose = detector.process_frame(frame, draw_landmarks=draw_landmarks)
+    session = sessions[session_id]
+    
+    with batch_lock:
+        session['frames_processed'] += 1
+        if pose is None:
+            return processed_frame, None, None
+        session['pending_poses'].append(pose)
+        if len(session['pending_poses']) >= BATCH_SIZE:
+            batch_ready.set()
+        prediction = session['last_prediction']
+    
+    # Respond with the most recent batched prediction rather than waiting on this frame's
+    if draw_landmarks and prediction is not None:
+        detector.draw_prediction(processed_frame, prediction)
+    
+    landmarks = pose.reshape(-1, 4).tolist()
+    
+    return processed_frame, prediction, landmarks
+
+def cached_result(session_id, draw_landmarks=False):
+    """
+    Return the session's last result if the previous frame was accepted recently enough to stand in
+    for this one; otherwise accept this frame for analysis, stamping its arrival time, and return None
+    """
+    session = sessions[session_id]
+    now = time.time()
+    
+    with batch_lock:
+        result = session['last_result']
+        if (result is not None
+                and (result['image'] is not None) == draw_landmarks
+                and now - session['last_decode_ts'] < MIN_ANALYSIS_PERIOD - ANALYSIS_JITTER):
+            return result
+        session['last_decode_ts'] = now
+        return None
+
+def analyze_session_image(session_id, image_bytes, draw_landmarks=False):
+    """
+    Decode and process a JPEG frame, and cache the result for skipped frames: the encoded JPEG (only
+    when drawing), the prediction and the landmarks. Returns None if the image cannot be decoded.
+    
+    The session's codec buffers are only reused when no other frame for the session is in flight;
+    a concurrent frame decodes and encodes into fresh buffers so neither corrupts the other.
+    """
+    session = sessions[session_id]
+    reuse = session['buffer_lock'].acquire(blocking=False)
+    
+    try:
+        frame = decode_frame(image_bytes, session, reuse)
+        
+        if frame is None:
+            return None
+        
+        processed_frame, prediction, landmarks = process_session_frame(session_id, frame, draw_landmarks)
+        
+        result = {
+            'image': bytes(encode_frame(processed_frame, session, reuse)) if draw_landmarks else None,
+            'prediction': prediction,
+            'landmarks': landmarks
+        }
+    finally:
+        if reuse:
+            session['buffer_lock'].release()
+    
+    session['last_result'] = result
+    return result
+
 @app.route('/api/body-language/start-session', methods=['POST'])
 def start_session():
     """Start a new body language analysis session"""
@@ -18,7 +196,14 @@ def start_session():
     sessions[session_id] = {
         'start_time': time.time(),
         'frames_processed': 0,
-        'detections': [],
+        'gesture_counts': Counter(),
+        'pending_poses': [],
+        'last_prediction': None,
+        'last_result': None,
+        'last_decode_ts': 0,
+        'buffer_lock': threading.Lock(),
+        'decode_dst': None,
+        'encode_dst': None,
     }
     
     print(f"Started session with ID: {session_id}")
@@ -61,30 +246,40 @@ def analyze_frame():
             }), 200
         
         try:
-            # Process the image
-            image_data = image_data.split(',')[1]
-            image_bytes = base64.b64decode(image_data)
-            nparr = np.frombuffer(image_bytes, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            draw_landmarks = is_enabled(data.get('draw_landmarks', False))
+            result = cached_result(session_id, draw_landmarks)
             
-            if frame is None:
-                return jsonify({'error': 'Invalid image data'}), 400
+            if result is None:
+                # Process the image, slicing off the data URL prefix instead of splitting the whole string
+                comma = image_data.find(',')
+                image_bytes = binascii.a2b_base64(image_data[comma + 1:] if comma >= 0 else image_data)
+                
+                # Process the frame with the detector
+                result = analyze_session_image(session_id, image_bytes, draw_landmarks)
+                
+                if result is None:
+                    return jsonify({'error': 'Invalid image data'}), 400
             
-            # Process the frame with the detector
-            processed_frame, prediction = detector.process_frame(frame)
+            # Only send an image back when the landmarks were drawn on it
+            if result['image'] is None:
+                return jsonify({
+                    'processed_image': '',
+                    'prediction': result['prediction'],
+                    'landmarks': result['landmarks']
+                })
             
-            # Update session data
-            if session_id in sessions:
-                sessions[session_id]['detections'].append(prediction)
-                sessions[session_id]['frames_processed'] += 1
+            # Clients that accept JPEG get the bytes directly instead of a base64 data URL
+            if request.accept_mimetypes.best_match(['application/json', 'image/jpeg']) == 'image/jpeg':
+                response = Response(result['image'], mimetype='image/jpeg')
+                response.headers['X-Prediction'] = json.dumps(result['prediction'])
+                return response
             
-            # Encode the processed frame
-            _, buffer = cv2.imencode('.jpg', processed_frame)
-            processed_image = base64.b64encode(buffer).decode('utf-8')
+            processed_image = base64.b64encode(result['image']).decode('ascii')
             
             return jsonify({
                 'processed_image': f'data:image/jpeg;base64,{processed_image}',
-                'prediction': prediction
+                'prediction': result['prediction'],
+                'landmarks': result['landmarks']
             })
             
         except Exception as e:
@@ -103,6 +298,105 @@ def analyze_frame():
             'error': str(e)
         }), 200  # Return 200 instead of 500 for graceful handling
 
+@app.route('/api/body-language/analyze-frame-raw', methods=['POST'])
+def analyze_frame_raw():
+    """Analyze a raw JPEG frame sent as the request body and return the prediction, or the processed JPEG if drawing"""
+    try:
+        session_id = request.headers.get('X-Session-Id') or request.args.get('session_id')
+        
+        if not session_id:
+            return jsonify({'error': 'Missing session_id'}), 400
+        
+        # Read the JPEG bytes straight from the body, skipping JSON and base64 entirely
+        image_bytes = request.get_data(cache=False)
+        
+        if not image_bytes:
+            return jsonify({'error': 'Missing image data'}), 400
+        
+        # Try to find the session ID even if it's not an exact match
+        matching_sessions = [sid for sid in sessions.keys() if str(sid) == str(session_id)]
+        if matching_sessions:
+            session_id = matching_sessions[0]
+            
+        if session_id not in sessions:
+            return jsonify({
+                'prediction': None,
+                'error': 'Session not found or expired'
+            }), 200
+        
+        draw_landmarks = is_enabled(request.args.get('draw_landmarks'))
+        result = cached_result(session_id, draw_landmarks)
+        
+        if result is None:
+            # Process the frame with the detector
+            result = analyze_session_image(session_id, image_bytes, draw_landmarks)
+            
+            if result is None:
+                return jsonify({'error': 'Invalid image data'}), 400
+        
+        # Without server-side drawing there is no image worth returning
+        if result['image'] is None:
+            return jsonify({
+                'prediction': result['prediction'],
+                'landmarks': result['landmarks']
+            })
+        
+        # Return the processed JPEG as-is; the prediction travels in a header
+        response = Response(result['image'], mimetype='image/jpeg')
+        response.headers['X-Prediction'] = json.dumps(result['prediction'])
+        return response
+        
+    except Exception as e:
+        print(f"Error in analyze_frame_raw: {str(e)}")
+        return jsonify({
+            'prediction': None,
+            'error': str(e)
+        }), 200  # Return 200 instead of 500 for graceful handling
+
+@sock.route('/api/body-language/ws/<session_id>', bp=app)
+def stream_frames(ws, session_id):
+    """
+    Analyze raw JPEG frames streamed over a WebSocket, replying with the prediction and landmarks as JSON,
+    preceded by the processed JPEG when drawing is requested
+    """
+    # Try to find the session ID even if it's not an exact match
+    matching_sessions = [sid for sid in sessions.keys() if str(sid) == str(session_id)]
+    if matching_sessions:
+        session_id = matching_sessions[0]
+    
+    if session_id not in sessions:
+        ws.send(json.dumps({'prediction': None, 'error': 'Session not found or expired'}))
+        return
+    
+    draw_landmarks = is_enabled(request.args.get('draw_landmarks'))
+    
+    # The client waits for each reply before sending its next frame
+    while True:
+        image_bytes = ws.receive()
+        
+        if session_id not in sessions:
+            ws.send(json.dumps({'prediction': None, 'error': 'Session not found or expired'}))
+            return
+        
+        try:
+            result = cached_result(session_id, draw_landmarks)
+            
+            if result is None:
+                # Process the frame with the detector
+                result = analyze_session_image(session_id, image_bytes, draw_landmarks)
+                
+                if result is None:
+                    ws.send(json.dumps({'prediction': None, 'error': 'Invalid image data'}))
+                    continue
+            
+            if result['image'] is not None:
+                ws.send(result['image'])
+            ws.send(json.dumps({'prediction': result['prediction'], 'landmarks': result['landmarks']}))
+            
+        except Exception as e:
+            print(f"Error in stream_frames: {str(e)}")
+            ws.send(json.dumps({'prediction': None, 'error': str(e)}))
+
 @app.route('/api/body-language/stop-session', methods=['POST'])
 def stop_session():
     """Stop an active session and return analysis results"""
@@ -139,24 +433,20 @@ def stop_session():
                 'overall_score': 0
             }), 200
         
+        # Classify any poses still waiting for the next batch
+        flush_pending_poses([session_id])
+        
         session_data = sessions[session_id]
         end_time = time.time()
         duration = end_time - session_data['start_time']
         
-        # Calculate gesture percentages
-        gesture_counts = {}
+        # Calculate gesture percentages from the running per-class counts
         total_frames = session_data['frames_processed']
         
         if total_frames > 0:
-            for detection in session_data['detections']:
-                gesture = detection['class']
-                if gesture not in gesture_counts:
-                    gesture_counts[gesture] = 0
-                gesture_counts[gesture] += 1
-            
             # Calculate percentages
             gesture_percentages = {}
-            for gesture, count in gesture_counts.items():
+            for gesture, count in session_data['gesture_counts'].items():
                 percentage = (count / total_frames) * 100
                 gesture_percentages[gesture] = {
                     'gesture_name': gesture,
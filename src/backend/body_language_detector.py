@@ -9,27 +9,50 @@ import mediapipe as mp
 import numpy as np
 import pickle
 import os
+import queue
+
+try:
+    import onnxruntime as ort
+except ImportError:
+    ort = None
 
 class BodyLanguageDetector:
     """
     A class for detecting body language in video frames using MediaPipe.
     """
     
-    def __init__(self):
+    # Frames wider than this are downscaled before pose detection
+    MAX_FRAME_WIDTH = 640
+    
+    # Default cap on Holistic instances; each one is a full MediaPipe graph
+    MAX_POOL_SIZE = 4
+    
+    def __init__(self, pool_size=None):
         """
         Initialize the BodyLanguageDetector with MediaPipe Holistic model and load the trained model.
+        
+        Args:
+            pool_size: Number of Holistic instances to lease to concurrent requests
+                (defaults to the CPU count, capped at MAX_POOL_SIZE)
         """
         # Initialize MediaPipe Holistic model
         self.mp_holistic = mp.solutions.holistic
         self.mp_drawing = mp.solutions.drawing_utils
         self.mp_drawing_styles = mp.solutions.drawing_styles
         
-        # Initialize the holistic model with good detection confidence
-        self.holistic = self.mp_holistic.Holistic(
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-            static_image_mode=False
-        )
+        # MediaPipe graphs are not thread-safe, so keep a pool of holistic models
+        # with good detection confidence and lease one per frame. The pool is LIFO so an
+        # uncontended stream keeps getting the same instance and its tracking state.
+        self._pool = queue.LifoQueue()
+        for _ in range(pool_size or min(os.cpu_count() or 1, self.MAX_POOL_SIZE)):
+            self._pool.put(self.mp_holistic.Holistic(
+                min_detection_confidence=0.5,
+                min_tracking_confidence=0.5,
+                static_image_mode=False
+            ))
+        
+        # Rendered prediction labels keyed by (class, rounded confidence)
+        self._text_cache = {}
         
         # Load the trained model
         model_path = os.path.join(os.path.dirname(__file__), 'body_language.pkl')
@@ -40,76 +63,158 @@ class BodyLanguageDetector:
         except Exception as e:
             print(f"Error loading model: {e}")
             self.model = None
+        
+        # Older pickles were fit single-threaded; let batched predict_proba use every core
+        steps = getattr(self.model, 'steps', None)
+        estimator = steps[-1][1] if steps else self.model
+        if hasattr(estimator, 'n_jobs'):
+            try:
+                estimator.set_params(n_jobs=-1)
+            except Exception as e:
+                print(f"Error enabling parallel prediction: {e}")
+        
+        # Prefer the ONNX export of the model when ONNX Runtime is available
+        self.ort_session = None
+        onnx_path = os.path.join(os.path.dirname(__file__), 'body_language.onnx')
+        if ort is not None and os.path.exists(onnx_path):
+            try:
+                self.ort_session = ort.InferenceSession(onnx_path, providers=['CPUExecutionProvider'])
+                print(f"ONNX model loaded from {onnx_path}")
+            except Exception as e:
+                print(f"Error loading ONNX model: {e}")
     
-    def process_frame(self, frame):
+    def process_frame(self, frame, draw_landmarks=False):
         """
-        Process a single frame and return the annotated image with body language prediction.
+        Process a single frame and return the (optionally annotated) image with the extracted pose.
+        
+        Classification is done separately by `classify` so poses can be batched across frames.
         
         Args:
             frame: The input frame to process
+            draw_landmarks: Whether to draw the pose landmarks on the image
             
         Returns:
-            tuple: (annotated_image, prediction)
-                - annotated_image: The frame with pose landmarks drawn
-                - prediction: A dictionary with class and confidence
+            tuple: (annotated_image, pose)
+                - annotated_image: The frame, with pose landmarks drawn if requested
+                - pose: The flattened landmark vector, or None if no pose was detected
         """
-        # Convert the BGR image to RGB
+        # Downscale large frames; landmarks are normalized so extraction is unaffected
+        height, width = frame.shape[:2]
+        if width > self.MAX_FRAME_WIDTH:
+            frame = cv2.resize(
+                frame,
+                (self.MAX_FRAME_WIDTH, int(self.MAX_FRAME_WIDTH * height / width)),
+                interpolation=cv2.INTER_AREA
+            )
+        
+        # Convert the BGR image to RGB for MediaPipe only; mark it read-only so it isn't copied
         rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        rgb_frame.flags.writeable = False
         
         # Process the image and get the results
-        results = self.holistic.process(rgb_frame)
+        holistic = self._pool.get()
+        try:
+            results = holistic.process(rgb_frame)
+        finally:
+            self._pool.put(holistic)
         
-        # Convert back to BGR for OpenCV
-        annotated_image = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2BGR)
+        # Annotate the original BGR frame directly
+        annotated_image = frame
         
-        # Draw the pose landmarks on the image
         if results.pose_landmarks:
-            # Draw landmarks with thicker lines and larger points for better visibility
-            self.mp_drawing.draw_landmarks(
-                annotated_image,
-                results.pose_landmarks,
-                self.mp_holistic.POSE_CONNECTIONS,
-                landmark_drawing_spec=self.mp_drawing.DrawingSpec(
-                    color=(0, 255, 0), thickness=4, circle_radius=6),
-                connection_drawing_spec=self.mp_drawing.DrawingSpec(
-                    color=(255, 0, 255), thickness=4)
-            )
+            # Draw the pose landmarks on the image only when asked; most clients draw them from the landmark list
+            if draw_landmarks:
+                # Draw landmarks with thicker lines and larger points for better visibility
+                self.mp_drawing.draw_landmarks(
+                    annotated_image,
+                    results.pose_landmarks,
+                    self.mp_holistic.POSE_CONNECTIONS,
+                    landmark_drawing_spec=self.mp_drawing.DrawingSpec(
+                        color=(0, 255, 0), thickness=4, circle_radius=6),
+                    connection_drawing_spec=self.mp_drawing.DrawingSpec(
+                        color=(255, 0, 255), thickness=4)
+                )
             
             # Extract pose landmarks
-            pose = self._extract_landmarks(results)
+            return annotated_image, self._extract_landmarks(results)
+        
+        return annotated_image, None
+    
+    def classify(self, poses):
+        """
+        Classify a batch of poses with a single model call.
+        
+        Args:
+            poses: A list of flattened landmark vectors from `_extract_landmarks`
+            
+        Returns:
+            list: A prediction dictionary with class and confidence for each pose,
+                or None for every pose if the model is unavailable
+        """
+        if (self.model is None and self.ort_session is None) or not poses:
+            return [None] * len(poses)
+        
+        try:
+            batch = np.stack(poses)
             
-            # Make prediction if model is loaded
-            prediction = None
-            if self.model is not None and pose is not None:
-                try:
-                    # Make prediction
-                    body_language_class = self.model.predict([pose])[0]
-                    body_language_prob = self.model.predict_proba([pose])[0]
-                    confidence = body_language_prob[list(self.model.classes_).index(body_language_class)]
-                    
-                    prediction = {
-                        'class': body_language_class,
-                        'confidence': float(confidence)
-                    }
-                    
-                    # Add prediction text to the image
-                    cv2.putText(
-                        annotated_image, 
-                        f"{body_language_class} ({confidence:.2f})", 
-                        (10, 30), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 
-                        1, 
-                        (0, 255, 0), 
-                        2, 
-                        cv2.LINE_AA
-                    )
-                except Exception as e:
-                    print(f"Error making prediction: {e}")
-                    prediction = None
+            if self.ort_session is not None:
+                # The ONNX graph returns labels and probabilities from a single run
+                body_language_classes, body_language_probs = self.ort_session.run(None, {'X': batch})
+                confidences = body_language_probs.max(axis=1)
+            else:
+                # predict() is just the argmax of predict_proba(), so walk the forest once
+                body_language_probs = self.model.predict_proba(batch)
+                best = body_language_probs.argmax(axis=1)
+                body_language_classes = self.model.classes_[best]
+                confidences = body_language_probs[np.arange(len(best)), best]
             
-            return annotated_image, prediction
+            # Plain str so both backends match and class names work as orjson dict keys (not numpy.str_)
+            return [
+                {
+                    'class': str(body_language_class),
+                    'confidence': float(confidence)
+                }
+                for body_language_class, confidence in zip(body_language_classes, confidences)
+            ]
+        except Exception as e:
+            print(f"Error making prediction: {e}")
+            return [None] * len(poses)
+    
+    def draw_prediction(self, image, prediction):
+        """
+        Draw the prediction label on the image.
         
-        return annotated_image, None
+        Labels are rendered once per (class, confidence to one decimal) and then copied in,
+        so glyphs are not rasterized on every frame.
+        
+        Args:
+            image: The image to draw on
+            prediction: A dictionary with class and confidence
+        """
+        key = (prediction['class'], round(prediction['confidence'], 1))
+        label = self._text_cache.get(key)
+        
+        if label is None:
+            text = f"{key[0]} ({key[1]:.1f})"
+            (text_width, _), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 1, 2)
+            strip = np.zeros((40, text_width + 20, 3), np.uint8)
+            cv2.putText(
+                strip, 
+                text, 
+                (10, 30), 
+                cv2.FONT_HERSHEY_SIMPLEX, 
+                1, 
+                (0, 255, 0), 
+                2, 
+                cv2.LINE_AA
+            )
+            # Only the text pixels are copied so the frame stays visible behind the label
+            label = self._text_cache[key] = (strip, strip.any(axis=2, keepdims=True))
+        
+        strip, mask = label
+        height = min(strip.shape[0], image.shape[0])
+        width = min(strip.shape[1], image.shape[1])
+        np.copyto(image[:height, :width], strip[:height, :width], where=mask[:height, :width])
     
     def _draw_landmarks(self, image, results):
         """
@@ -190,32 +295,22 @@ class BodyLanguageDetector:
     
     def _extract_landmarks(self, results):
         """
-        Extract landmarks from the MediaPipe results.
+        Extract pose landmarks from the MediaPipe results.
         
         Args:
             results: The MediaPipe results object
             
         Returns:
-            list: A flattened list of landmarks
+            np.ndarray: A flattened float32 vector of pose landmarks
         """
-        pose = []
-        
         # Extract pose landmarks
-        if results.pose_landmarks:
-            for landmark in results.pose_landmarks.landmark:
-                pose.append([landmark.x, landmark.y, landmark.z, landmark.visibility])
-        else:
+        if not results.pose_landmarks:
             # If no pose landmarks detected, return None
             return None
         
-        # Extract face landmarks
-        face = []
-        if results.face_landmarks:
-            for landmark in results.face_landmarks.landmark:
-                face.append([landmark.x, landmark.y, landmark.z, 0])  # No visibility score for face
-        else:
-            # If no face landmarks, fill with zeros
-            face = [[0, 0, 0, 0]] * 468  # MediaPipe uses 468 face landmarks
-        
-        # Combine all landmarks
-        return np.array(pose + face).flatten().tolist()
+        landmarks = results.pose_landmarks.landmark
+        return np.fromiter(
+            (v for lm in landmarks for v in (lm.x, lm.y, lm.z, lm.visibility)),
+            dtype=np.float32,
+            count=len(landmarks) * 4
+        )
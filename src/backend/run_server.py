@@ -2,16 +2,25 @@
 Backend Server
 
 This script runs the Flask server for the backend API.
+
+For anything beyond local development, serve it with gunicorn's threaded worker so concurrent
+frames overlap inside MediaPipe (which releases the GIL) and WebSockets keep working:
+
+    gunicorn -w 1 --threads 8 -k gthread -b 0.0.0.0:5000 'run_server:app'
+
+Keep a single worker: sessions and the batch classifier live in process memory.
 """
 
 import os
 from flask import Flask, jsonify
 from flask_cors import CORS
+from flask_orjson import OrjsonProvider
 from body_language_api import app as body_language_app
 
 # Create Flask app
 app = Flask(__name__)
-CORS(app, resources={r"/api/*": {"origins": "*"}})  # Enable CORS for all API routes
+app.json = OrjsonProvider(app)  # orjson for request.json / jsonify on the per-frame hot path
+CORS(app, resources={r"/api/*": {"origins": "*", "expose_headers": ["X-Prediction"]}})  # Enable CORS for all API routes
 
 # Register the body language API blueprint
 app.register_blueprint(body_language_app)
@@ -28,5 +37,5 @@ if __name__ == '__main__':
     # Get port from environment variable or use default
     port = int(os.environ.get('PORT', 5000))
     
-    # Run the Flask app
-    app.run(host='0.0.0.0', port=port, debug=True)
+    # Run the Flask app with the threaded development server (no debugger or reloader)
+    app.run(host='0.0.0.0', port=port, threaded=True)
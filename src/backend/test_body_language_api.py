@@ -0,0 +1,70 @@
+"""
+Body Language API Tests
+
+Runs a full start / analyze / stop session through the Flask app and its orjson provider.
+"""
+
+import base64
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+import body_language_api
+from run_server import app
+
+# A pose matching the trainer's "Thumbs Up" pattern
+THUMBS_UP_POSE = np.full(33 * 4, 0.05, np.float32)
+THUMBS_UP_POSE[50:60] = 0.95
+
+class BodyLanguageSessionTest(unittest.TestCase):
+    """
+    MediaPipe only sees the detector's pose vector, so `process_frame` is stubbed to return a
+    known pose and the session exercises the real classifier and JSON serialization.
+    """
+
+    def setUp(self):
+        self.client = app.test_client()
+        self.detector = body_language_api.detector
+        _, buffer = cv2.imencode('.jpg', np.zeros((48, 64, 3), np.uint8))
+        self.image_data = 'data:image/jpeg;base64,' + base64.b64encode(buffer).decode('ascii')
+
+    def run_session(self):
+        session_id = self.client.post('/api/body-language/start-session').get_json()['session_id']
+
+        response = self.client.post('/api/body-language/analyze-frame', json={
+            'session_id': session_id,
+            'image_data': self.image_data
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('error', response.get_json())
+
+        response = self.client.post('/api/body-language/stop-session', json={'session_id': session_id})
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def assert_thumbs_up_session(self, result):
+        self.assertEqual(result['frames_processed'], 1)
+        self.assertEqual(result['gesture_percentages']['Thumbs Up']['gesture_count'], 1)
+        self.assertEqual(result['allowed_gestures']['Thumbs Up']['gesture_percentage'], 100)
+
+    def test_session_with_sklearn_model(self):
+        with mock.patch.object(self.detector, 'ort_session', None), \
+                mock.patch.object(self.detector, 'process_frame', return_value=(None, THUMBS_UP_POSE.copy())):
+            self.assert_thumbs_up_session(self.run_session())
+
+    def test_session_with_onnx_model(self):
+        if self.detector.ort_session is None:
+            self.skipTest('ONNX Runtime or body_language.onnx unavailable')
+
+        with mock.patch.object(self.detector, 'process_frame', return_value=(None, THUMBS_UP_POSE.copy())):
+            self.assert_thumbs_up_session(self.run_session())
+
+    def test_classify_returns_plain_str(self):
+        with mock.patch.object(self.detector, 'ort_session', None):
+            prediction, = self.detector.classify([THUMBS_UP_POSE])
+        self.assertIs(type(prediction['class']), str)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -13,6 +13,8 @@ from sklearn.pipeline import make_pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
 import pickle
 import os
 
@@ -28,53 +30,38 @@ def train_model():
     
     # Create a more realistic dataset with distinct patterns for each class
     num_samples_per_class = 50
-    num_features = 33 * 4 + 468 * 4  # Pose landmarks (33 points) + Face landmarks (468 points) with x, y, z, visibility
+    num_features = 33 * 4  # Pose landmarks (33 points) with x, y, z, visibility
     
-    # Initialize empty arrays
-    X = np.zeros((num_samples_per_class * len(gesture_classes), num_features))
+    # Base pattern is random; fill it once for all rows in float32 to halve memory
+    rng = np.random.default_rng()
+    X = rng.random((num_samples_per_class * len(gesture_classes), num_features), dtype=np.float32)
+    X *= 0.1
     y = np.array([cls for cls in gesture_classes for _ in range(num_samples_per_class)])
     
-    # Create more distinct patterns for each class
+    # Distinct pattern per gesture class: (feature indices, base value, random spread)
+    gesture_patterns = {
+        "Victorious": (np.arange(40, 50), 0.8, 0.2),       # Victory sign - fingers up pattern (arbitrary indices for demonstration)
+        "Thumbs Up": (np.arange(50, 60), 0.9, 0.1),        # Thumbs up pattern
+        "Open Palm": (np.arange(60, 80), 0.7, 0.3),        # Open palm pattern
+        "Pointing": (np.arange(80, 90), 0.85, 0.15),       # Pointing pattern
+        "Crossed Arms": (np.arange(90, 110), 0.75, 0.25)   # Crossed arms pattern
+    }
+    
+    # Create more distinct patterns for each class, only overwriting the pattern slice
     for i, gesture in enumerate(gesture_classes):
         start_idx = i * num_samples_per_class
         end_idx = (i + 1) * num_samples_per_class
         
-        # Base pattern is random
-        X[start_idx:end_idx] = np.random.rand(num_samples_per_class, num_features) * 0.1
-        
-        # Add distinct patterns for each gesture class
-        if gesture == "Victorious":
-            # Victory sign - fingers up pattern
-            finger_indices = np.arange(200, 250)  # Arbitrary indices for demonstration
-            X[start_idx:end_idx, finger_indices] = 0.8 + np.random.rand(num_samples_per_class, len(finger_indices)) * 0.2
-            
-        elif gesture == "Thumbs Up":
-            # Thumbs up pattern
-            thumb_indices = np.arange(300, 350)
-            X[start_idx:end_idx, thumb_indices] = 0.9 + np.random.rand(num_samples_per_class, len(thumb_indices)) * 0.1
-            
-        elif gesture == "Open Palm":
-            # Open palm pattern
-            palm_indices = np.arange(400, 500)
-            X[start_idx:end_idx, palm_indices] = 0.7 + np.random.rand(num_samples_per_class, len(palm_indices)) * 0.3
-            
-        elif gesture == "Pointing":
-            # Pointing pattern
-            point_indices = np.arange(500, 550)
-            X[start_idx:end_idx, point_indices] = 0.85 + np.random.rand(num_samples_per_class, len(point_indices)) * 0.15
-            
-        elif gesture == "Crossed Arms":
-            # Crossed arms pattern
-            arm_indices = np.arange(600, 700)
-            X[start_idx:end_idx, arm_indices] = 0.75 + np.random.rand(num_samples_per_class, len(arm_indices)) * 0.25
+        indices, base, spread = gesture_patterns[gesture]
+        X[start_idx:end_idx, indices] = base + rng.random((num_samples_per_class, len(indices)), dtype=np.float32) * spread
     
     # Split the data
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
     
     # Create a pipeline with preprocessing and model (using RandomForest for better accuracy)
     pipeline = make_pipeline(
-        StandardScaler(), 
-        RandomForestClassifier(n_estimators=100, random_state=42)
+        StandardScaler(copy=False), 
+        RandomForestClassifier(n_estimators=100, n_jobs=-1, max_features='sqrt', random_state=42)
     )
     
     # Train the model
@@ -91,6 +78,18 @@ def train_model():
         pickle.dump(pipeline, f)
     
     print(f"Model saved to {model_path}")
+    
+    # Export to ONNX so the detector can run the forest with ONNX Runtime's tree kernels
+    onnx_model = convert_sklearn(
+        pipeline,
+        initial_types=[('X', FloatTensorType([None, num_features]))],
+        options={RandomForestClassifier: {'zipmap': False}}  # Return probabilities as a plain tensor
+    )
+    onnx_path = os.path.join(os.path.dirname(__file__), 'body_language.onnx')
+    with open(onnx_path, 'wb') as f:
+        f.write(onnx_model.SerializeToString())
+    
+    print(f"ONNX model saved to {onnx_path}")
 
 if __name__ == "__main__":
     train_model()
@@ -11,11 +11,17 @@ import {
 import RealTimeDetection from './RealTimeDetection';
 import BodyLanguageResults from './BodyLanguageResults';
 import { 
-  analyzeBodyLanguageFrame, 
+  openBodyLanguageStream, 
+  BodyLanguageStream, 
   startBodyLanguageSession, 
   stopBodyLanguageSession 
 } from '@/pages/api/body-language-feedback';
-import { getGestureColor, getGestureStatus } from '@/backend/bodyLanguageFeedback';
+import {
+  BodyLanguageAnalysisResult,
+  drawPoseLandmarks,
+  getGestureColor,
+  getGestureStatus
+} from '@/backend/bodyLanguageFeedback';
 import { PoseAnalysisProvider } from './PoseAnalysisContext';
 
 interface PoseAnalysisProps {
@@ -226,12 +232,72 @@ const PoseAnalysis: React.FC<PoseAnalysisProps> = ({
   // Process frames when recording - analyze every 5 frames for more frequent skeletal visualization
   useEffect(() => {
     let frameProcessingInterval: NodeJS.Timeout | null = null;
+    let frameStream: BodyLanguageStream | null = null;
+    
+    const handleResult = (result: BodyLanguageAnalysisResult) => {
+      // Update current prediction if available
+      if (result && !result.processedImage && result.prediction) {
+        setCurrentPrediction(result.prediction);
+        onPredictionUpdate && onPredictionUpdate({ gesture: result.prediction.class, confidence: result.prediction.confidence });
+      }
+      
+      // Draw the live video with the skeleton from the returned landmarks
+      if (result && !result.processedImage && canvasRef.current && videoRef.current) {
+        const canvas = canvasRef.current;
+        const displayCtx = canvas.getContext('2d');
+        if (displayCtx) {
+          canvas.width = videoRef.current.videoWidth || 640;
+          canvas.height = videoRef.current.videoHeight || 480;
+          
+          // The analyzed frame was mirrored, so mirror the video to line up with the landmarks
+          displayCtx.save();
+          displayCtx.scale(-1, 1);
+          displayCtx.drawImage(videoRef.current, -canvas.width, 0, canvas.width, canvas.height);
+          displayCtx.restore();
+          
+          if (result.landmarks) {
+            drawPoseLandmarks(displayCtx, result.landmarks, canvas.width, canvas.height);
+          }
+        }
+      }
+      
+      if (result && result.processedImage) {
+        setLastProcessedImage(result.processedImage);
+        
+        // Update current prediction if available
+        if (result.prediction) {
+          setCurrentPrediction(result.prediction);
+          onPredictionUpdate && onPredictionUpdate({ gesture: result.prediction.class, confidence: result.prediction.confidence });
+        }
+        
+        // Draw the processed image on the canvas
+        if (canvasRef.current) {
+          const displayCtx = canvasRef.current.getContext('2d');
+          if (displayCtx) {
+            const img = new Image();
+            img.onload = () => {
+              if (canvasRef.current && displayCtx) {
+                displayCtx.clearRect(0, 0, canvasRef.current.width, canvasRef.current.height);
+                displayCtx.drawImage(img, 0, 0, canvasRef.current.width, canvasRef.current.height);
+              }
+              URL.revokeObjectURL(img.src);
+            };
+            img.src = result.processedImage;
+          }
+        }
+      }
+    };
     
     const processFrame = async () => {
       if (!isRecording || !sessionId || !stream || !videoRef.current || !canvasRef.current) {
         return;
       }
       
+      // Skip this tick while the previous frame is still being analyzed
+      if (!frameStream || !frameStream.isReady()) {
+        return;
+      }
+      
       try {
         const canvas = document.createElement('canvas');
         const video = videoRef.current;
@@ -246,35 +312,12 @@ const PoseAnalysis: React.FC<PoseAnalysisProps> = ({
         ctx.scale(-1, 1);
         ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
         
-        const imageData = canvas.toDataURL('image/jpeg', 0.8);
+        const imageData = await new Promise<Blob | null>(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.8));
         
-        // Process the frame
-        const result = await analyzeBodyLanguageFrame(sessionId, imageData);
+        if (!imageData) return;
         
-        if (result && result.processedImage) {
-          setLastProcessedImage(result.processedImage);
-          
-          // Update current prediction if available
-          if (result.prediction) {
-            setCurrentPrediction(result.prediction);
-            onPredictionUpdate && onPredictionUpdate({ gesture: result.prediction.class, confidence: result.prediction.confidence });
-          }
-          
-          // Draw the processed image on the canvas
-          if (canvasRef.current) {
-            const displayCtx = canvasRef.current.getContext('2d');
-            if (displayCtx) {
-              const img = new Image();
-              img.onload = () => {
-                if (canvasRef.current && displayCtx) {
-                  displayCtx.clearRect(0, 0, canvasRef.current.width, canvasRef.current.height);
-                  displayCtx.drawImage(img, 0, 0, canvasRef.current.width, canvasRef.current.height);
-                }
-              };
-              img.src = result.processedImage;
-            }
-          }
-        }
+        // Send the frame; the result arrives through handleResult
+        frameStream.sendFrame(imageData);
       } catch (error) {
         console.error('Error processing frame:', error);
         // Don't set error state here to avoid UI disruption during recording
@@ -283,6 +326,8 @@ const PoseAnalysis: React.FC<PoseAnalysisProps> = ({
     };
     
     if (isRecording && sessionId && stream) {
+      frameStream = openBodyLanguageStream(sessionId, handleResult);
+      
       // Process frames at a reasonable interval (200ms) instead of every animation frame
       // This prevents overwhelming the server with requests
       frameProcessingInterval = setInterval(processFrame, 200);
@@ -292,6 +337,9 @@ const PoseAnalysis: React.FC<PoseAnalysisProps> = ({
       if (frameProcessingInterval) {
         clearInterval(frameProcessingInterval);
       }
+      if (frameStream) {
+        frameStream.close();
+      }
     };
   }, [isRecording, sessionId, stream, videoRef, canvasRef, onPredictionUpdate]);
 
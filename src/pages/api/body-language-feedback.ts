@@ -1,4 +1,4 @@
-import { SessionResult } from '@/backend/bodyLanguageFeedback';
+import { BodyLanguageAnalysisResult, SessionResult } from '@/backend/bodyLanguageFeedback';
 
 /**
  * Start a new body language analysis session
@@ -30,7 +30,7 @@ export async function startBodyLanguageSession(): Promise<string> {
 export async function analyzeBodyLanguageFrame(
   sessionId: string,
   imageData: string
-): Promise<{ processedImage: string; prediction: any }> {
+): Promise<BodyLanguageAnalysisResult> {
   try {
     const response = await fetch('http://localhost:5000/api/body-language/analyze-frame', {
       method: 'POST',
@@ -59,6 +59,7 @@ export async function analyzeBodyLanguageFrame(
     return {
       processedImage: data.processed_image || '',
       prediction: data.prediction,
+      landmarks: data.landmarks,
     };
   } catch (error) {
     console.error('Error analyzing body language frame:', error);
@@ -66,6 +67,125 @@ export async function analyzeBodyLanguageFrame(
   }
 }
 
+/**
+ * Analyze a single frame sent as raw JPEG bytes (no JSON/base64 wrapping)
+ */
+export async function analyzeBodyLanguageFrameRaw(
+  sessionId: string,
+  image: Blob,
+  drawLandmarks = false
+): Promise<BodyLanguageAnalysisResult> {
+  try {
+    const response = await fetch(`http://localhost:5000/api/body-language/analyze-frame-raw?draw_landmarks=${drawLandmarks ? 1 : 0}`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'image/jpeg',
+        'X-Session-Id': sessionId,
+      },
+      body: image,
+    });
+
+    if (!response.ok) {
+      console.warn(`Frame analysis response not OK: ${response.status}`);
+      return { processedImage: '', prediction: null };
+    }
+
+    // Predictions and errors come back as JSON, processed frames (when drawing) as image/jpeg
+    if (!response.headers.get('Content-Type')?.startsWith('image/jpeg')) {
+      const data = await response.json();
+      if (data.error) {
+        console.warn(`Error from server: ${data.error}`);
+        return { processedImage: '', prediction: null };
+      }
+      return { processedImage: '', prediction: data.prediction, landmarks: data.landmarks };
+    }
+
+    const predictionHeader = response.headers.get('X-Prediction');
+    const blob = await response.blob();
+
+    return {
+      processedImage: URL.createObjectURL(blob),
+      prediction: predictionHeader ? JSON.parse(predictionHeader) : null,
+    };
+  } catch (error) {
+    console.error('Error analyzing body language frame:', error);
+    return { processedImage: '', prediction: null };
+  }
+}
+
+export interface BodyLanguageStream {
+  isReady: () => boolean;
+  sendFrame: (image: Blob) => boolean;
+  close: () => void;
+}
+
+/**
+ * Open a WebSocket that streams raw JPEG frames for analysis.
+ * Each frame gets one reply: the prediction and landmarks as JSON, preceded by the
+ * processed JPEG as a binary message when drawLandmarks is set.
+ */
+export function openBodyLanguageStream(
+  sessionId: string,
+  onResult: (result: BodyLanguageAnalysisResult) => void,
+  drawLandmarks = false
+): BodyLanguageStream {
+  const socket = new WebSocket(
+    `ws://localhost:5000/api/body-language/ws/${sessionId}?draw_landmarks=${drawLandmarks ? 1 : 0}`
+  );
+  socket.binaryType = 'blob';
+
+  let processedImage: Blob | null = null;
+  let awaitingReply = false;
+
+  socket.onmessage = (event) => {
+    if (event.data instanceof Blob) {
+      processedImage = event.data;
+      return;
+    }
+
+    awaitingReply = false;
+    try {
+      const data = JSON.parse(event.data);
+
+      // Check if there was an error in the response
+      if (data.error) {
+        console.warn(`Error from server: ${data.error}`);
+        onResult({ processedImage: '', prediction: null });
+      } else {
+        onResult({
+          processedImage: processedImage ? URL.createObjectURL(processedImage) : '',
+          prediction: data.prediction,
+          landmarks: data.landmarks,
+        });
+      }
+    } catch (error) {
+      console.error('Error analyzing body language frame:', error);
+      onResult({ processedImage: '', prediction: null });
+    }
+    processedImage = null;
+  };
+
+  socket.onerror = (error) => {
+    console.error('Body language stream error:', error);
+  };
+
+  // Only one frame is in flight at a time so the client never outpaces the server
+  const isReady = () => socket.readyState === WebSocket.OPEN && !awaitingReply;
+
+  return {
+    isReady,
+    sendFrame: (image: Blob) => {
+      if (!isReady()) {
+        return false;
+      }
+      awaitingReply = true;
+      socket.send(image);
+      return true;
+    },
+    close: () => socket.close(),
+  };
+}
+
 // Define the interface for body language metrics
 export interface BodyLanguageMetrics {
   sessionId: string;